@@ -62,19 +62,20 @@ def run_selected_scenarios(
     show_progress: bool,
     workers: int,
 ) -> None:
-    scenarios = {
-        "deadlock": DeadlockScenario(HOLD_TIME, DEADLOCK_TIMEOUT, show_progress, workers),
-        "ordenado": OrderedScenario(HOLD_TIME, show_progress, workers),
-        "retry": RetryScenario(HOLD_TIME, try_timeout=DEFAULT_RETRY_TIMEOUT, show_progress=show_progress, workers=workers),
-        "banqueiro": BankerScenario(HOLD_TIME, show_progress, workers),
+    # Fábricas adiadas: só o cenário selecionado é construído.
+    factories = {
+        "deadlock": lambda: DeadlockScenario(HOLD_TIME, DEADLOCK_TIMEOUT, show_progress, workers),
+        "ordenado": lambda: OrderedScenario(HOLD_TIME, show_progress, workers),
+        "retry": lambda: RetryScenario(HOLD_TIME, try_timeout=DEFAULT_RETRY_TIMEOUT, show_progress=show_progress, workers=workers),
+        "banqueiro": lambda: BankerScenario(HOLD_TIME, show_progress, workers),
     }
     all_metrics: List[Metrics] = []
 
     if selected == "todos":
         for key in ("deadlock", "ordenado", "retry", "banqueiro"):
-            all_metrics.extend(scenarios[key].run())
+            all_metrics.extend(factories[key]().run())
     else:
-        all_metrics.extend(scenarios[selected].run())
+        all_metrics.extend(factories[selected]().run())
 
     if metrics_out:
         export_metrics(all_metrics, metrics_out, metrics_format)
@@ -13,6 +13,8 @@ class Banker:
         self.available = list(available)
         self.max_claims = [list(row) for row in max_claims]
         self.allocation = [[0 for _ in range(self.resource_count)] for _ in range(self.process_count)]
+        # Mantida incrementalmente para não recalcular max - allocation a cada pedido.
+        self.need = [list(row) for row in max_claims]
         self.lock = threading.Lock()
 
     def request_resources(self, pid: int, request: List[int]) -> bool:
@@ -25,11 +27,16 @@ class Banker:
                 return False
             if not self._fits_available(request):
                 return False
-            if not self._safe_if_granted(pid, request):
+            # Atalho: se o pedido completa a necessidade restante do processo,
+            # ele pode rodar até o fim e devolver tudo, então um estado seguro
+            # continua seguro — não precisa simular a sequência inteira.
+            completes_need = all(req == n for req, n in zip(request, self.need[pid]))
+            if not completes_need and not self._safe_if_granted(pid, request):
                 return False
             for idx, amount in enumerate(request):
                 self.available[idx] -= amount
                 self.allocation[pid][idx] += amount
+                self.need[pid][idx] -= amount
             return True
 
     def release_all(self, pid: int) -> List[int]:
@@ -41,6 +48,7 @@ class Banker:
                 released.append(amount)
                 self.available[idx] += amount
                 self.allocation[pid][idx] = 0
+                self.need[pid][idx] = self.max_claims[pid][idx]
             return released
 
     def snapshot(self) -> dict:
@@ -54,42 +62,40 @@ class Banker:
 
 
     def _within_need(self, pid: int, request: List[int]) -> bool:
-        need = self._need_for(pid)
-        return all(req <= n for req, n in zip(request, need))
+        return all(req <= n for req, n in zip(request, self.need[pid]))
 
     def _fits_available(self, request: List[int]) -> bool:
         return all(req <= avail for req, avail in zip(request, self.available))
 
     def _safe_if_granted(self, pid: int, request: List[int]) -> bool:
-        available = list(self.available)
-        allocation = [list(row) for row in self.allocation]
-        max_claims = [list(row) for row in self.max_claims]
-
-        for idx in range(self.resource_count):
-            available[idx] -= request[idx]
-            allocation[pid][idx] += request[idx]
-
-        need = [
-            [max_claims[p][r] - allocation[p][r] for r in range(self.resource_count)]
-            for p in range(self.process_count)
-        ]
-        work = list(available)
-        finish = [False for _ in range(self.process_count)]
-
-        while True:
+        # Simula o estado pós-concessão só com a linha do pedinte ajustada,
+        # sem copiar as matrizes inteiras a cada verificação.
+        # Atributos consultados a cada iteração viram locais do laço.
+        need_rows = self.need
+        allocation_rows = self.allocation
+        resource_range = range(self.resource_count)
+
+        work = [avail - req for avail, req in zip(self.available, request)]
+        need_pid = [n - req for n, req in zip(need_rows[pid], request)]
+        unfinished = list(range(self.process_count))
+
+        while unfinished:
             progressed = False
-            for proc in range(self.process_count):
-                if finish[proc]:
-                    continue
-                if all(need_item <= work_res for need_item, work_res in zip(need[proc], work)):
-                    for r_idx in range(self.resource_count):
-                        work[r_idx] += allocation[proc][r_idx]
-                    finish[proc] = True
+            still_waiting: List[int] = []
+            for proc in unfinished:
+                need = need_pid if proc == pid else need_rows[proc]
+                if all(need_item <= work_res for need_item, work_res in zip(need, work)):
+                    allocation = allocation_rows[proc]
+                    for r_idx in resource_range:
+                        work[r_idx] += allocation[r_idx]
+                    if proc == pid:
+                        for r_idx in resource_range:
+                            work[r_idx] += request[r_idx]
                     progressed = True
+                else:
+                    still_waiting.append(proc)
+            unfinished = still_waiting
             if not progressed:
                 break
 
-        return all(finish)
-
-    def _need_for(self, pid: int) -> List[int]:
-        return [max_r - alloc_r for max_r, alloc_r in zip(self.max_claims[pid], self.allocation[pid])]
+        return not unfinished
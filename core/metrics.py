@@ -3,13 +3,40 @@
 import csv
 import json
 import multiprocessing as mp
+import queue
+import sys
+import time
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Deque, Dict, List, Optional
 
 Metrics = Dict[str, Any]
 
+# Template da linha por worker do resumo, montado uma vez (método bound
+# reutilizado em vez de refazer a f-string a cada linha).
+_SUMMARY_ROW = " - {}: status={}, duração={}, espera={}, retries={}".format
 
-def create_metrics_queue() -> mp.Queue | None:
+
+class LocalMetricsSink:
+    """Coletor de métricas para workers que são threads do mesmo processo.
+
+    O append de deque é atômico no CPython, então dispensa o mutex e a
+    condição que queue.Queue paga a cada put.
+    """
+
+    def __init__(self) -> None:
+        self._items: Deque[Metrics] = deque()
+
+    def put(self, payload: Metrics) -> None:
+        self._items.append(payload)
+
+    def drain(self) -> List[Metrics]:
+        items = list(self._items)
+        self._items.clear()
+        return items
+
+
+def create_metrics_queue() -> Optional[mp.Queue]:
     """Cria a fila de métricas ou desativa telemetria se não houver permissão."""
     try:
         return mp.Queue()
@@ -18,16 +45,37 @@ def create_metrics_queue() -> mp.Queue | None:
         return None
 
 
-def collect_metrics(metrics_queue: mp.Queue | None) -> List[Metrics]:
-    """Coleta métricas acumuladas na fila."""
+def collect_metrics(metrics_queue: Optional[mp.Queue], expected_batches: int = 0) -> List[Metrics]:
+    """Coleta métricas acumuladas na fila (ou no sink local de threads).
+
+    Para a fila compartilhada do pool a leitura é determinística: espera um
+    lote por worker submetido (expected_batches) até um prazo curto, porque o
+    resultado do future chega pelo pipe síncrono do executor enquanto o lote
+    viaja pela thread alimentadora assíncrona da mp.Queue — logo empty() pode
+    ser True por instantes mesmo com o worker já concluído.
+    """
     if metrics_queue is None:
         return []
+    if isinstance(metrics_queue, LocalMetricsSink):
+        batches = metrics_queue.drain()
+    else:
+        batches = []
+        deadline = time.monotonic() + 2.0
+        while len(batches) < expected_batches:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batches.append(metrics_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+    # Cada worker envia um lote (lista) de métricas em um único put.
     metrics: List[Metrics] = []
-    while not metrics_queue.empty():
-        try:
-            metrics.append(metrics_queue.get_nowait())
-        except Exception:
-            break
+    for batch in batches:
+        if isinstance(batch, list):
+            metrics.extend(batch)
+        else:
+            metrics.append(batch)
     return metrics
 
 
@@ -36,8 +84,15 @@ def summarize_metrics(metrics: List[Metrics], duration: float, process_names: Li
     if not metrics:
         return
 
-    print("[RESUMO] Tempo total do cenário: "
-          f"{round(duration, 3)}s (inclui criação/enceramento de processos).")
+    # Monta o resumo inteiro em memória e grava com um único write,
+    # em vez de um print (e um flush) por linha.
+    lines = ["[RESUMO] Tempo total do cenário: "
+             f"{round(duration, 3)}s (inclui criação/enceramento de processos)."]
+    # Uma única passada sobre as métricas monta as linhas e acumula as médias.
+    reported = set()
+    retries_sum = retries_count = 0
+    duration_sum = duration_count = 0
+    wait_sum = wait_count = 0
     for metric in metrics:
         name = metric.get("name", "?")
         status = metric.get("status", "desconhecido")
@@ -47,27 +102,34 @@ def summarize_metrics(metrics: List[Metrics], duration: float, process_names: Li
         duration_text = f"{metric_duration:.3f}s" if metric_duration is not None else "n/d"
         retries_text = retries if retries is not None else 0
         wait_text = f"{wait_time:.3f}s" if wait_time is not None else "n/d"
-        print(f" - {name}: status={status}, duração={duration_text}, espera={wait_text}, retries={retries_text}")
+        lines.append(_SUMMARY_ROW(name, status, duration_text, wait_text, retries_text))
+
+        reported.add(name)
+        if isinstance(retries, (int, float)):
+            retries_sum += retries
+            retries_count += 1
+        if isinstance(metric_duration, (int, float)):
+            duration_sum += metric_duration
+            duration_count += 1
+        if isinstance(wait_time, (int, float)):
+            wait_sum += wait_time
+            wait_count += 1
 
-    reported = {metric.get("name") for metric in metrics}
     missing = [name for name in process_names if name not in reported]
     if missing:
-        print(f" - Sem telemetria (interrompidos?): {missing}")
-
-    def average(numbers: List[float]) -> float | None:
-        valid = [n for n in numbers if n is not None]
-        return sum(valid) / len(valid) if valid else None
+        lines.append(f" - Sem telemetria (interrompidos?): {missing}")
 
-    avg_retries = average([metric.get("retries") for metric in metrics if isinstance(metric.get("retries"), (int, float))])
-    avg_duration = average([metric.get("duration") for metric in metrics if isinstance(metric.get("duration"), (int, float))])
-    avg_wait_time = average([metric.get("wait_time") for metric in metrics if isinstance(metric.get("wait_time"), (int, float))])
+    avg_retries = retries_sum / retries_count if retries_count else None
+    avg_duration = duration_sum / duration_count if duration_count else None
+    avg_wait_time = wait_sum / wait_count if wait_count else None
     if avg_retries is not None:
-        print(f"[{scenario_tag}] Média de retries: {avg_retries:.1f}")
+        lines.append(f"[{scenario_tag}] Média de retries: {avg_retries:.1f}")
     if avg_duration is not None:
-        print(f"[{scenario_tag}] Tempo total médio: {avg_duration:.2f}s")
+        lines.append(f"[{scenario_tag}] Tempo total médio: {avg_duration:.2f}s")
     if avg_wait_time is not None:
-        print(f"[{scenario_tag}] Tempo médio aguardando recurso: {avg_wait_time:.2f}s")
-    print()
+        lines.append(f"[{scenario_tag}] Tempo médio aguardando recurso: {avg_wait_time:.2f}s")
+    lines.append("")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def export_metrics(metrics: List[Metrics], path_str: str, fmt: str) -> None:
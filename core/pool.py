@@ -0,0 +1,82 @@
+"""Pool persistente de processos compartilhado entre os cenários."""
+
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from core.metrics import create_metrics_queue
+
+# As primitivas compartilhadas (locks, fila de métricas, evento de cancelamento)
+# precisam existir antes do primeiro submit para serem herdadas pelos filhos do
+# pool no fork; por isso são criadas junto com o executor e reutilizadas depois.
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_size = 0
+_locks: List = []
+_metrics_queue = None
+_metrics_ready = False
+_cancel_event = None
+
+LOCK_COUNT = 2
+
+
+def _ensure_primitives() -> None:
+    global _metrics_queue, _metrics_ready, _cancel_event
+    if not _locks:
+        _locks.extend(mp.Lock() for _ in range(LOCK_COUNT))
+    if _cancel_event is None:
+        _cancel_event = mp.Event()
+    if not _metrics_ready:
+        _metrics_queue = create_metrics_queue()
+        _metrics_ready = True
+
+
+def get_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Retorna o executor compartilhado, criando-o (com as primitivas) uma vez."""
+    global _executor, _executor_size
+    if _executor is not None and _executor_size >= max_workers:
+        return _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+    _ensure_primitives()
+    # O registro por índice só funciona porque os filhos herdam este módulo
+    # via fork; com spawn/forkserver eles reimportariam um core.pool vazio,
+    # então o contexto é fixado explicitamente em vez de depender do padrão.
+    _executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=mp.get_context("fork"))
+    _executor_size = max_workers
+    return _executor
+
+
+def shared_locks() -> List:
+    """Locks pré-criados que os filhos do pool conhecem por herança."""
+    _ensure_primitives()
+    return list(_locks)
+
+
+def shared_metrics_queue():
+    """Fila de métricas compartilhada (ou None se a telemetria foi desativada)."""
+    _ensure_primitives()
+    return _metrics_queue
+
+
+def shared_cancel_event():
+    """Evento usado pelo pai para pedir que workers presos desistam."""
+    _ensure_primitives()
+    return _cancel_event
+
+
+def lock_index(lock) -> Optional[int]:
+    """Índice do lock no registro compartilhado, ou None se não for dele."""
+    for idx, candidate in enumerate(_locks):
+        if candidate is lock:
+            return idx
+    return None
+
+
+def lock_from_index(idx: int):
+    if not _locks:
+        raise RuntimeError(
+            "Registro de locks do pool vazio: o processo filho não herdou "
+            "core.pool via fork (start method 'spawn'/'forkserver' reimporta "
+            "o módulo sem as primitivas compartilhadas)."
+        )
+    return _locks[idx]
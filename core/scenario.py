@@ -1,18 +1,30 @@
 """Cenários de concorrência para demonstrar deadlocks e soluções."""
 
+import concurrent.futures
 import multiprocessing as mp
-import queue
 import random
 import threading
 import time
 from abc import ABC, abstractmethod
-from typing import Iterable, List
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 from core.banker import Banker
-from core.metrics import Metrics, collect_metrics, create_metrics_queue, summarize_metrics
+from core.metrics import LocalMetricsSink, Metrics, collect_metrics, summarize_metrics
+from core.pool import get_pool, shared_cancel_event, shared_locks, shared_metrics_queue
 from core.worker import BankerWorker, NaiveWorker, RetryWorker, Worker
 
 
+@lru_cache(maxsize=None)
+def _labels_tuple(count: int) -> Tuple[str, ...]:
+    return tuple(f"Recurso {chr(ord('A') + idx)}" for idx in range(count))
+
+
+def generate_labels(count: int) -> List[str]:
+    """Nomes dos recursos ("Recurso A", "Recurso B", ...), memoizados por quantidade."""
+    return list(_labels_tuple(count))
+
+
 class Scenario(ABC):
     """Base para cenários de concorrência."""
 
@@ -25,43 +37,46 @@ class Scenario(ABC):
     def run(self) -> List[Metrics]:
         print(f"\n=== {self.title} ===")
         scenario_start = time.time()
-        metrics_queue = create_metrics_queue()
+        executor = get_pool(self.workers)
+        metrics_queue = shared_metrics_queue()
         self.describe_resources()
 
-        processes = self._spawn_workers(metrics_queue)
-        self.wait_processes(processes, metrics_queue)
+        workers = self.build_workers(metrics_queue)
+        names = [worker.name for worker in workers]
+        futures = [executor.submit(worker.execute) for worker in workers]
+        if self.show_progress:
+            print(f"[PROGRESSO] {len(futures)}/{len(futures)} processos iniciados.")
+        self.wait_futures(futures, names)
         duration = time.time() - scenario_start
-        metrics = collect_metrics(metrics_queue)
+        metrics = collect_metrics(metrics_queue, expected_batches=len(names))
         for metric in metrics:
             metric["scenario"] = self.title
             metric["cenario"] = self.scenario_tag
         self.after_finish()
-        summarize_metrics(metrics, duration, [p.name for p in processes], self.scenario_tag)
+        summarize_metrics(metrics, duration, names, self.scenario_tag)
         return metrics
 
-    def _spawn_workers(self, metrics_queue: mp.Queue | None) -> List[mp.Process]:
-        workers = self.build_workers(metrics_queue)
-        processes = [mp.Process(target=worker.run, name=worker.name) for worker in workers]
-        for process in processes:
-            process.start()
-        if self.show_progress:
-            print(f"[PROGRESSO] {len(processes)}/{len(processes)} processos iniciados.")
-        return processes
-
-    def wait_processes(self, processes: Iterable[mp.Process], metrics_queue: mp.Queue | None) -> None:
+    def wait_futures(self, futures: List[concurrent.futures.Future], names: List[str]) -> None:
         completed = 0
-        processes = list(processes)
-        total = len(processes)
-        for process in processes:
-            process.join()
+        total = len(futures)
+        name_of = dict(zip(futures, names))
+        for future in concurrent.futures.as_completed(futures):
+            self._report_future_error(name_of[future], future)
             completed += 1
             self.report_progress(completed, total)
 
+    @staticmethod
+    def _report_future_error(name: str, future: concurrent.futures.Future) -> None:
+        """Repassa para o console exceções que morreriam dentro do future."""
+        error = future.exception()
+        if error is not None:
+            print(f"[PAI] {name} falhou: {type(error).__name__}: {error}")
+
     def after_finish(self) -> None:
         """Hook para mensagens finais."""
 
     @abstractmethod
-    def build_workers(self, metrics_queue: mp.Queue | None) -> List[Worker]:
+    def build_workers(self, metrics_queue: Optional[mp.Queue]) -> List[Worker]:
         """Cria os workers que serão executados no cenário."""
 
     def report_progress(self, completed: int, total: int) -> None:
@@ -81,17 +96,18 @@ class DeadlockScenario(Scenario):
         self.hold_time = hold_time
         self.timeout = timeout
 
-    def build_workers(self, metrics_queue: mp.Queue | None) -> List[Worker]:
-        lock_a = mp.Lock()
-        lock_b = mp.Lock()
+    def build_workers(self, metrics_queue: Optional[mp.Queue]) -> List[Worker]:
+        lock_a, lock_b = shared_locks()
+        label_a, label_b = generate_labels(2)
+        cancel_event = shared_cancel_event()
         workers: List[Worker] = []
         for idx in range(self.workers):
             if idx % 2 == 0:
-                first_lock, first_label = lock_a, "Recurso A"
-                second_lock, second_label = lock_b, "Recurso B"
+                first_lock, first_label = lock_a, label_a
+                second_lock, second_label = lock_b, label_b
             else:
-                first_lock, first_label = lock_b, "Recurso B"
-                second_lock, second_label = lock_a, "Recurso A"
+                first_lock, first_label = lock_b, label_b
+                second_lock, second_label = lock_a, label_a
 
             workers.append(
                 NaiveWorker(
@@ -102,34 +118,36 @@ class DeadlockScenario(Scenario):
                     second_label,
                     self.hold_time,
                     metrics_queue,
+                    cancel_event=cancel_event,
                 )
             )
         return workers
 
-    def wait_processes(self, processes: Iterable[mp.Process], metrics_queue: mp.Queue | None) -> None:
-        processes = list(processes)
-        total = len(processes)
-        completed = 0
-        for process in processes:
-            process.join(timeout=self.timeout)
-            if not process.is_alive():
-                completed += 1
-                self.report_progress(completed, total)
-
-        stuck = [process for process in processes if process.is_alive()]
-        if stuck:
+    def wait_futures(self, futures: List[concurrent.futures.Future], names: List[str]) -> None:
+        total = len(futures)
+        name_of = dict(zip(futures, names))
+        done, pending = concurrent.futures.wait(futures, timeout=self.timeout)
+        completed = len(done)
+        for future in done:
+            self._report_future_error(name_of[future], future)
+        for idx in range(1, completed + 1):
+            self.report_progress(idx, total)
+
+        if pending:
+            stuck = [name for name, future in zip(names, futures) if future in pending]
             print(
-                f"\n[PAI] Deadlock detectado: processos {[p.name for p in stuck]} "
+                f"\n[PAI] Deadlock detectado: processos {stuck} "
                 f"continuam vivos após {self.timeout}s."
             )
-            for process in stuck:
-                process.terminate()
-            for process in processes:
-                process.join()
-                if not process.is_alive():
-                    completed += 1
-                    self.report_progress(completed, total)
-            print("[PAI] Finalizei processos presos para evitar travar a execução.\n")
+            cancel_event = shared_cancel_event()
+            cancel_event.set()
+            concurrent.futures.wait(pending)
+            cancel_event.clear()
+            for future in pending:
+                self._report_future_error(name_of[future], future)
+            for idx in range(completed + 1, total + 1):
+                self.report_progress(idx, total)
+            print("[PAI] Cancelei os processos presos para evitar travar a execução.\n")
         else:
             print("[PAI] Surpreendente! Eles terminaram (talvez o ambiente seja muito rápido).")
 
@@ -144,16 +162,16 @@ class OrderedScenario(Scenario):
         super().__init__("CENÁRIO 2: Prevenção com ordem fixa de aquisição", show_progress, workers)
         self.hold_time = hold_time
 
-    def build_workers(self, metrics_queue: mp.Queue | None) -> List[Worker]:
-        lock_a = mp.Lock()
-        lock_b = mp.Lock()
+    def build_workers(self, metrics_queue: Optional[mp.Queue]) -> List[Worker]:
+        lock_a, lock_b = shared_locks()
+        label_a, label_b = generate_labels(2)
         return [
             NaiveWorker(
                 f"P{idx + 1}",
                 lock_a,
-                "Recurso A",
+                label_a,
                 lock_b,
-                "Recurso B",
+                label_b,
                 self.hold_time,
                 metrics_queue,
             )
@@ -175,17 +193,17 @@ class RetryScenario(Scenario):
         self.hold_time = hold_time
         self.try_timeout = try_timeout
 
-    def build_workers(self, metrics_queue: mp.Queue | None) -> List[Worker]:
-        lock_a = mp.Lock()
-        lock_b = mp.Lock()
+    def build_workers(self, metrics_queue: Optional[mp.Queue]) -> List[Worker]:
+        lock_a, lock_b = shared_locks()
+        label_a, label_b = generate_labels(2)
         workers: List[Worker] = []
         for idx in range(self.workers):
             if idx % 2 == 0:
-                first_lock, first_label = lock_a, "Recurso A"
-                second_lock, second_label = lock_b, "Recurso B"
+                first_lock, first_label = lock_a, label_a
+                second_lock, second_label = lock_b, label_b
             else:
-                first_lock, first_label = lock_b, "Recurso B"
-                second_lock, second_label = lock_a, "Recurso A"
+                first_lock, first_label = lock_b, label_b
+                second_lock, second_label = lock_a, label_a
 
             workers.append(
                 RetryWorker(
@@ -214,7 +232,7 @@ class BankerScenario(Scenario):
     def __init__(self, hold_time: float, show_progress: bool = False, workers: int = 3) -> None:
         super().__init__("CENÁRIO 4: Evitação com algoritmo do banqueiro", show_progress, workers)
         self.hold_time = hold_time
-        self.resource_labels = ["Recurso A", "Recurso B"]
+        self.resource_labels = generate_labels(2)
         base_capacity = max(2, workers - 1)
         self.resource_pool = [base_capacity, base_capacity]
         self._printed_resources = False
@@ -222,10 +240,10 @@ class BankerScenario(Scenario):
     def run(self) -> List[Metrics]:
         print(f"\n=== {self.title} ===")
         scenario_start = time.time()
-        metrics_queue: queue.Queue[Metrics] = queue.Queue()
+        metrics_queue = LocalMetricsSink()
 
         workers = self.build_workers(metrics_queue)
-        threads = [threading.Thread(target=worker.run, name=worker.name) for worker in workers]
+        threads = [threading.Thread(target=worker.execute, name=worker.name) for worker in workers]
         for thread in threads:
             thread.start()
         if self.show_progress:
@@ -249,7 +267,7 @@ class BankerScenario(Scenario):
         print(f"[PAI] Recursos totais: {pool_text}")
         self._printed_resources = True
 
-    def build_workers(self, metrics_queue: mp.Queue | None) -> List[Worker]:
+    def build_workers(self, metrics_queue: Optional[mp.Queue]) -> List[Worker]:
         claims = self._build_claims()
         banker = Banker(self.resource_pool, claims)
         self._print_claims(claims)
@@ -1,16 +1,23 @@
 """Workers que competem por recursos, com suporte a métricas."""
 
 import multiprocessing as mp
+import os
 import random
 import threading
 import time
+import zlib
 from abc import ABC, abstractmethod
 from typing import List, Optional
 
+from core import pool
 from core.banker import Banker
 from core.logging_utils import log
 from core.metrics import Metrics
 
+_POOL_LOCK = "__pool_lock__"
+_POOL_QUEUE = "__pool_queue__"
+_POOL_EVENT = "__pool_event__"
+
 
 class Worker(ABC):
     """Interface comum para workers que competem por recursos compartilhados."""
@@ -24,6 +31,7 @@ class Worker(ABC):
         second_label: str,
         hold_time: float,
         metrics_queue: Optional[mp.Queue] = None,
+        cancel_event: Optional[mp.Event] = None,
     ) -> None:
         self.name = name
         self.first_lock = first_lock
@@ -32,35 +40,97 @@ class Worker(ABC):
         self.second_label = second_label
         self.hold_time = hold_time
         self.metrics_queue = metrics_queue
-        self.started_at: float | None = None
+        self.cancel_event = cancel_event
+        # Sem fila de métricas não há o que medir: os caminhos quentes usam
+        # esta flag para pular as amostragens de relógio.
+        self._timing_enabled = metrics_queue is not None
+        self.started_at: int | None = None
         self.retries = 0
-        self.wait_time = 0.0
+        self.wait_ns = 0
+        # Métricas ficam acumuladas localmente e vão para a fila em um único put.
+        self._pending_metrics: List[Metrics] = []
+
+    def __getstate__(self) -> dict:
+        """Substitui primitivas do pool por referências para viajar pelo executor."""
+        state = self.__dict__.copy()
+        for attr in ("first_lock", "second_lock"):
+            idx = pool.lock_index(state[attr])
+            if idx is not None:
+                state[attr] = (_POOL_LOCK, idx)
+        if state.get("metrics_queue") is not None and state["metrics_queue"] is pool.shared_metrics_queue():
+            state["metrics_queue"] = _POOL_QUEUE
+        if state.get("cancel_event") is not None:
+            state["cancel_event"] = _POOL_EVENT
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        for attr in ("first_lock", "second_lock"):
+            value = state[attr]
+            if isinstance(value, tuple) and value[0] == _POOL_LOCK:
+                state[attr] = pool.lock_from_index(value[1])
+        if state.get("metrics_queue") == _POOL_QUEUE:
+            state["metrics_queue"] = pool.shared_metrics_queue()
+        if state.get("cancel_event") == _POOL_EVENT:
+            state["cancel_event"] = pool.shared_cancel_event()
+        self.__dict__.update(state)
 
     def log(self, message: str) -> None:
         log(self.name, message)
 
     def record_start(self) -> None:
-        self.started_at = time.time()
+        if not self._timing_enabled:
+            return
+        self.started_at = time.perf_counter_ns()
 
     def record_end(self, status: str = "ok") -> None:
         if self.metrics_queue is None:
             return
-        ended_at = time.time()
-        duration = round(ended_at - self.started_at, 3) if self.started_at else None
+        ended_at = time.perf_counter_ns()
+        duration = round((ended_at - self.started_at) / 1e9, 3) if self.started_at else None
         payload: Metrics = {
             "name": self.name,
             "status": status,
             "retries": self.retries,
             "duration": duration,
-            "wait_time": round(self.wait_time, 3),
+            "wait_time": round(self.wait_ns / 1e9, 3),
         }
-        self.metrics_queue.put(payload)
+        self._pending_metrics.append(payload)
+
+    def flush_metrics(self) -> None:
+        """Descarrega as métricas acumuladas na fila em um único put."""
+        if self.metrics_queue is None or not self._pending_metrics:
+            return
+        self.metrics_queue.put(self._pending_metrics)
+        self._pending_metrics = []
+
+    def execute(self) -> None:
+        """Executa run() garantindo o envio das métricas ao final."""
+        try:
+            self.run()
+        finally:
+            self.flush_metrics()
 
     def increment_retry(self) -> None:
         self.retries += 1
 
-    def add_wait_time(self, amount: float) -> None:
-        self.wait_time += max(0.0, amount)
+    def add_wait_ns(self, amount: int) -> None:
+        if amount > 0:
+            self.wait_ns += amount
+
+    def _backoff(self, seconds: float) -> None:
+        """Espera antes de tentar de novo.
+
+        Para esperas abaixo de 1ms, dormir no kernel custa mais que a própria
+        espera; nesse caso apenas cede a CPU algumas vezes (quando o sistema
+        oferece sched_yield) em vez de chamar time.sleep.
+        """
+        if seconds < 1e-3:
+            yield_cpu = getattr(os, "sched_yield", None)
+            if yield_cpu is not None:
+                for _ in range(min(64, max(1, int(seconds * 1e6)))):
+                    yield_cpu()
+                return
+        time.sleep(seconds)
 
     @abstractmethod
     def run(self) -> None:
@@ -70,35 +140,65 @@ class Worker(ABC):
 class NaiveWorker(Worker):
     """Implementação que pode cair em deadlock."""
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # Mensagens fixas montadas uma única vez, em vez de f-strings por aquisição.
+        self._msg_need_first = f"precisa do {self.first_label}"
+        self._msg_got_first = f"pegou {self.first_label}, trabalhando..."
+        self._msg_try_second = f"tentando também o {self.second_label}"
+        self._msg_got_second = f"pegou {self.second_label}, terminou trabalho conjunto"
+        self._msg_released_second = f"liberou {self.second_label}"
+        self._msg_released_first = f"liberou {self.first_label} e finalizou"
+        self._msg_cancel_first = f"cancelado pelo pai enquanto esperava {self.first_label}"
+        self._msg_cancel_second = f"cancelado pelo pai enquanto esperava {self.second_label}"
+
+    def _acquire(self, lock: mp.Lock) -> bool:
+        """Bloqueia no lock, mas desiste se o pai sinalizar cancelamento."""
+        if self.cancel_event is None:
+            lock.acquire()
+            return True
+        while not self.cancel_event.is_set():
+            if lock.acquire(timeout=0.1):
+                return True
+        return False
+
     def run(self) -> None:
         self.record_start()
         first_acquired = False
         second_acquired = False
         try:
-            self.log(f"precisa do {self.first_label}")
-            wait_start = time.time()
-            self.first_lock.acquire()
-            self.add_wait_time(time.time() - wait_start)
+            self.log(self._msg_need_first)
+            wait_start = time.perf_counter_ns() if self._timing_enabled else 0
+            if not self._acquire(self.first_lock):
+                self.log(self._msg_cancel_first)
+                self.record_end("cancelado")
+                return
+            if self._timing_enabled:
+                self.add_wait_ns(time.perf_counter_ns() - wait_start)
             first_acquired = True
 
-            self.log(f"pegou {self.first_label}, trabalhando...")
+            self.log(self._msg_got_first)
             time.sleep(self.hold_time)
-            self.log(f"tentando também o {self.second_label}")
+            self.log(self._msg_try_second)
 
-            wait_start = time.time()
-            self.second_lock.acquire()
-            self.add_wait_time(time.time() - wait_start)
+            wait_start = time.perf_counter_ns() if self._timing_enabled else 0
+            if not self._acquire(self.second_lock):
+                self.log(self._msg_cancel_second)
+                self.record_end("cancelado")
+                return
+            if self._timing_enabled:
+                self.add_wait_ns(time.perf_counter_ns() - wait_start)
             second_acquired = True
 
-            self.log(f"pegou {self.second_label}, terminou trabalho conjunto")
+            self.log(self._msg_got_second)
             time.sleep(self.hold_time)
             self.second_lock.release()
             second_acquired = False
-            self.log(f"liberou {self.second_label}")
+            self.log(self._msg_released_second)
 
             self.first_lock.release()
             first_acquired = False
-            self.log(f"liberou {self.first_label} e finalizou")
+            self.log(self._msg_released_first)
             self.record_end("ok")
         except Exception:
             self.record_end("erro")
@@ -126,29 +226,37 @@ class RetryWorker(Worker):
     ) -> None:
         super().__init__(name, first_lock, first_label, second_lock, second_label, hold_time, metrics_queue)
         self.try_timeout = try_timeout
-        self._rng = random.Random(name)
+        self._rng = random.Random(zlib.crc32(name.encode()))
+        # Mensagens do laço de retry, montadas uma única vez.
+        self._msg_need_first = f"precisa do {self.first_label}"
+        self._msg_retry_first = f"não conseguiu {self.first_label} em {self.try_timeout}s, tentando de novo"
+        self._msg_want_second = f"pegou {self.first_label}, agora quer o {self.second_label}"
+        self._msg_got_second = f"pegou {self.second_label}, fez o trabalho e vai liberar ambos"
+        self._msg_timeout_second = f"timeout aguardando {self.second_label}, devolvendo {self.first_label}"
 
     def run(self) -> None:
         self.record_start()
         try:
             while True:
-                self.log(f"precisa do {self.first_label}")
-                wait_start = time.time()
+                self.log(self._msg_need_first)
+                wait_start = time.perf_counter_ns() if self._timing_enabled else 0
                 got_first = self.first_lock.acquire(timeout=self.try_timeout)
-                self.add_wait_time(time.time() - wait_start)
+                if self._timing_enabled:
+                    self.add_wait_ns(time.perf_counter_ns() - wait_start)
                 if not got_first:
                     self.increment_retry()
-                    self.log(f"não conseguiu {self.first_label} em {self.try_timeout}s, tentando de novo")
+                    self.log(self._msg_retry_first)
                     continue
 
-                self.log(f"pegou {self.first_label}, agora quer o {self.second_label}")
+                self.log(self._msg_want_second)
                 time.sleep(self.hold_time)
-                wait_start = time.time()
+                wait_start = time.perf_counter_ns() if self._timing_enabled else 0
                 got_second = self.second_lock.acquire(timeout=self.try_timeout)
-                self.add_wait_time(time.time() - wait_start)
+                if self._timing_enabled:
+                    self.add_wait_ns(time.perf_counter_ns() - wait_start)
 
                 if got_second:
-                    self.log(f"pegou {self.second_label}, fez o trabalho e vai liberar ambos")
+                    self.log(self._msg_got_second)
                     time.sleep(self.hold_time)
                     self.second_lock.release()
                     self.first_lock.release()
@@ -157,12 +265,11 @@ class RetryWorker(Worker):
                     break
 
                 self.increment_retry()
-                self.log(f"timeout aguardando {self.second_label}, devolvendo {self.first_label}")
+                self.log(self._msg_timeout_second)
                 self.first_lock.release()
                 sleep_for = self.hold_time / 2 + self._rng.uniform(0, self.hold_time / 2)
-                start_sleep = time.time()
-                time.sleep(sleep_for)
-                self.add_wait_time(time.time() - start_sleep)
+                self._backoff(sleep_for)
+                self.add_wait_ns(int(sleep_for * 1e9))
         except Exception:
             self.record_end("erro")
             raise
@@ -195,17 +302,13 @@ class BankerWorker(Worker):
         self.claim = claim
         self.resource_labels = resource_labels
         self.wait_between_attempts = max(0.2, hold_time / 2)
-        self._rng = random.Random(name)
+        self._rng = random.Random(zlib.crc32(name.encode()))
 
     def _build_request(self, remaining: List[int]) -> List[int]:
         """Gera um pedido parcial para evitar monopolizar tudo de uma vez."""
-        request: List[int] = []
-        for need in remaining:
-            if need <= 0:
-                request.append(0)
-                continue
-            request.append(self._rng.randint(1, need))
-        if all(value == 0 for value in request):
+        randint = self._rng.randint
+        request = [randint(1, need) if need > 0 else 0 for need in remaining]
+        if not any(request):
             idx = self._rng.randrange(len(remaining))
             request[idx] = 1
         return request
@@ -242,9 +345,8 @@ class BankerWorker(Worker):
                     f"esperando {self.wait_between_attempts:.2f}s"
                 )
                 wait_for = self.wait_between_attempts + self._rng.uniform(0, self.hold_time / 2)
-                start_sleep = time.time()
-                time.sleep(wait_for)
-                self.add_wait_time(time.time() - start_sleep)
+                self._backoff(wait_for)
+                self.add_wait_ns(int(wait_for * 1e9))
         except Exception:
             self.record_end("erro")
             raise
@@ -1,9 +1,13 @@
 """Ponto de entrada do simulador de deadlocks."""
 
+import os
+import shlex
 import sys
 
 from cli import main as cli_main
 
+# Usado apenas quando o script roda sem argumentos; a variável de ambiente
+# DEADLOCK_SIM_ARGS substitui o preset sem precisar editar este arquivo.
 PRESET_ARGS: list[str] | None = [
     "banqueiro", # parametros: deadlock || ordenado || retry || banqueiro || todos
     "--workers",
@@ -17,7 +21,13 @@ PRESET_ARGS: list[str] | None = [
 
 
 def main(argv: list[str] | None = None) -> None:
-    effective_args = PRESET_ARGS if PRESET_ARGS is not None else (argv if argv is not None else sys.argv[1:])
+    effective_args = argv if argv is not None else sys.argv[1:]
+    if not effective_args:
+        env_args = os.environ.get("DEADLOCK_SIM_ARGS")
+        if env_args is not None:
+            effective_args = shlex.split(env_args)
+        elif PRESET_ARGS is not None:
+            effective_args = PRESET_ARGS
     cli_main(effective_args)
 
 